@@ -1,11 +1,13 @@
 from dotenv import load_dotenv
 import os
+import asyncio
+import shutil
 import uuid
-import json
+import orjson
 from datetime import datetime
-from fastapi import FastAPI, UploadFile, HTTPException, BackgroundTasks, File, Body, Form
+from fastapi import FastAPI, UploadFile, HTTPException, BackgroundTasks, File, Body, Form, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse
 import uvicorn
 import logging
 
@@ -14,6 +16,7 @@ from models.process import ProcessStatus, ProcessInfo
 from services.elevenlabs import ElevenLabsService
 from services.language_feedback import LanguageFeedbackService
 from services.allosaurus_service import AllosaurusService
+from services.http_client import close_http_client
 
 from utils import get_root_folder
 
@@ -28,6 +31,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware to allow frontend access
@@ -42,14 +46,39 @@ app.add_middleware(
 # Store active processes
 active_processes = {}
 
+# Set once a process reaches a final status, so status requests can long-poll
+process_done_events = {}
+
+# Longest time a status request may block waiting for completion, in seconds
+MAX_STATUS_WAIT = 60
+
+# Block size used when saving uploads
+UPLOAD_CHUNK_SIZE = 1 << 20
+
 # Singleton instances
 mistral_service = LanguageFeedbackService() 
 elevenlabs_service = ElevenLabsService() 
 allosaurus_service = AllosaurusService()
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await elevenlabs_service.close()
+    await close_http_client()
+
+
+def reset_done_event(process_id: str):
+    """
+    Give a process that is (re)starting an unset completion event, so long-polls wait for this run.
+    """
+    event = process_done_events.get(process_id)
+    if event is None or event.is_set():
+        process_done_events[process_id] = asyncio.Event()
+
+
 # Process WAV file
 async def process_wav_file(process_id: str, file_path: str, includePhonetics: bool = False):
+    reset_done_event(process_id)
     try:
         # Update status to ElevenLabs processing
         active_processes[process_id].status = ProcessStatus.ELEVENLABS_PROCESSING
@@ -58,10 +87,13 @@ async def process_wav_file(process_id: str, file_path: str, includePhonetics: bo
         # Initialize result dictionary to store partial results
         partial_results = {}
         
+        # Step 1.5 only needs the audio file, so run Allosaurus while waiting for ElevenLabs
+        allosaurus_task = asyncio.create_task(allosaurus_service.recognize_phonemes(file_path))
+        
         try:
             # Step 1: Send to ElevenLabs for speech-to-text
             elevenlabs_result = await elevenlabs_service.speech_to_text(file_path)
-            elevenlabs_segments = elevenlabs_result.extract_segments()
+            elevenlabs_segments = elevenlabs_result.speaker_segments
             
             # Debug logs
             logger.info(f"ElevenLabs segments type: {type(elevenlabs_segments)}")
@@ -91,11 +123,14 @@ async def process_wav_file(process_id: str, file_path: str, includePhonetics: bo
             
         except Exception as e:
             logger.error(f"Error in ElevenLabs processing: {str(e)}")
+            # Recognition runs in a worker thread that cancelling cannot stop, so it still runs
+            # to completion; only retrieve its outcome so a failure is not reported as unretrieved
+            allosaurus_task.add_done_callback(lambda task: task.cancelled() or task.exception())
             raise Exception(f"Speech-to-text processing failed: {str(e)}")
         
         try:
-            # Step 1.5: Process with Allosaurus for phoneme recognition
-            allosaurus_result = await allosaurus_service.recognize_phonemes(file_path)
+            # Step 1.5: Collect the phoneme recognition started above
+            allosaurus_result = await allosaurus_task
             partial_results["allosaurus"] = allosaurus_result
             
             # Update status and partial results
@@ -111,28 +146,47 @@ async def process_wav_file(process_id: str, file_path: str, includePhonetics: bo
         active_processes[process_id].status = ProcessStatus.MISTRAL_PROCESSING
         active_processes[process_id].updated_at = datetime.now().isoformat()
         
-        try:
-            # Step 2: Send to Mistral for language feedback and summary
-            mistral_result = await mistral_service.process_transcript(
-                elevenlabs_result, 
-                elevenlabs_segments, 
+        # Expose feedback items to status polling while Mistral is still generating
+        partial_results["mistral"] = {
+            "mistakes": [],
+            "inaccuracies": [],
+            "vocabularies": [],
+            "phonetics": []
+        }
+        active_processes[process_id].result = partial_results
+
+        def on_feedback_item(section: str, item):
+            partial_results["mistral"][section].append(item)
+            active_processes[process_id].updated_at = datetime.now().isoformat()
+
+        # Step 2: Send to Mistral for language feedback and summary, which are independent.
+        # Both always finish here, so the feedback stream cannot change the result after completion
+        mistral_result, summary = await asyncio.gather(
+            mistral_service.process_transcript(
+                elevenlabs_result,
                 include_phonetics=includePhonetics,
-                phonetics_data=partial_results.get("allosaurus", None) if includePhonetics else None
-            )
-            
-            summary = await mistral_service.summarize_conversation(elevenlabs_result)
-            
-            partial_results["mistral"] = mistral_result
-            partial_results["summary"] = summary
-        except Exception as e:
-            logger.error(f"Error in Mistral processing: {str(e)}")
+                phonetics_data=partial_results.get("allosaurus", None) if includePhonetics else None,
+                on_item=on_feedback_item
+            ),
+            mistral_service.summarize_conversation(elevenlabs_result),
+            return_exceptions=True
+        )
+        
+        if isinstance(mistral_result, BaseException):
+            logger.error(f"Error in Mistral processing: {str(mistral_result)}")
             # Continue with empty results if Mistral fails
-            partial_results["mistral"] = {
+            mistral_result = {
                 "mistakes": [],
                 "inaccuracies": [],
-                "vocabularies": []
+                "vocabularies": [],
+                "phonetics": []
             }
-            partial_results["summary"] = "Could not generate summary due to an error."
+        partial_results["mistral"] = mistral_result
+        
+        if isinstance(summary, BaseException):
+            logger.error(f"Error in Mistral summary: {str(summary)}")
+            summary = "Could not generate summary due to an error."
+        partial_results["summary"] = summary
         
         # Update process with final result - keep any partial results we got
         active_processes[process_id].status = ProcessStatus.COMPLETE
@@ -153,7 +207,9 @@ async def process_wav_file(process_id: str, file_path: str, includePhonetics: bo
         #         os.remove(file_path)
         #     except Exception as cleanup_error:
         #         logger.error(f"Error removing temporary file {file_path}: {str(cleanup_error)}")
-        pass
+
+        # Wake up any status requests long-polling on this process
+        process_done_events.setdefault(process_id, asyncio.Event()).set()
 
 @app.post("/upload", response_model=ProcessInfo, summary="Upload a WAV file for processing")
 async def upload_file(
@@ -176,9 +232,10 @@ async def upload_file(
     # Create temporary file path
     temp_file_path = f"temp_{process_id}.wav"
     
-    # Save uploaded file
+    # Save uploaded file in 1 MiB blocks instead of buffering the whole upload
     with open(temp_file_path, "wb") as f:
-        f.write(await file.read())
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            f.write(chunk)
     
     # Initialize process info but set status as UPLOADED (not PENDING)
     process_info = ProcessInfo(
@@ -217,6 +274,7 @@ async def start_processing(
     # Update process status to PENDING
     active_processes[process_id].status = ProcessStatus.PENDING
     active_processes[process_id].updated_at = datetime.now().isoformat()
+    reset_done_event(process_id)
     
     # Start processing in background
     background_tasks.add_task(process_wav_file, process_id, temp_file_path, includePhonetics)
@@ -224,15 +282,26 @@ async def start_processing(
     return active_processes[process_id]
 
 @app.get("/status/{process_id}", response_model=None, summary="Check the status of a process")
-async def check_status(process_id: str):
+async def check_status(
+    process_id: str,
+    wait: float = Query(0, ge=0, le=MAX_STATUS_WAIT, description="Seconds to wait for the process to finish")
+):
     """
     Check the status of a process.
     
     Returns the current status, creation time, last update time, and result (if available).
+    With wait > 0 the request blocks until the process completes or fails, or the wait runs out.
     """
     if process_id not in active_processes:
         raise HTTPException(status_code=404, detail="Process not found")
     
+    if wait > 0 and active_processes[process_id].status not in (ProcessStatus.COMPLETE, ProcessStatus.FAILED):
+        done = process_done_events.setdefault(process_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(done.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+    
     # Log the data we're returning
     process_info = active_processes[process_id]
     if process_info.result and "elevenlabs" in process_info.result:
@@ -252,7 +321,7 @@ async def check_status(process_id: str):
     try:
         process_dict = process_info.dict()
         # Test serialization
-        json.dumps(process_dict)
+        orjson.dumps(process_dict)
         return process_dict
     except TypeError as e:
         logger.error(f"Serialization error: {str(e)}")
@@ -328,9 +397,8 @@ async def reprocess_audio(
     # Create a copy of the original file with the new process ID
     new_temp_file_path = f"temp_{new_process_id}.wav"
     try:
-        with open(original_temp_file, "rb") as src_file:
-            with open(new_temp_file_path, "wb") as dst_file:
-                dst_file.write(src_file.read())
+        # copyfile uses the OS's in-kernel copy where available
+        await asyncio.to_thread(shutil.copyfile, original_temp_file, new_temp_file_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error copying audio file: {str(e)}")
     
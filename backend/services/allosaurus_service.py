@@ -2,21 +2,108 @@
 Allosaurus phoneme recognition service.
 """
 import os
+import hashlib
+import logging
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List
 import asyncio
 
+# Number of recognition results kept in memory, keyed by audio content
+RESULT_CACHE_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
 class AllosaurusService:
     """
     Service for phoneme recognition using Allosaurus.
+    
+    There is one instance per model name and process: constructing the service again returns
+    the existing instance, so the model is loaded once and its result cache is shared.
+    
+    The model is loaded and warmed up in a background thread, so construction returns
+    immediately; the first use of `model` waits until loading has finished.
     """
     
-    def __init__(self):
+    _instances: Dict[str, "AllosaurusService"] = {}
+    _instances_lock = threading.Lock()
+    
+    def __new__(cls, model_name: str = "latest"):
+        with cls._instances_lock:
+            instance = cls._instances.get(model_name)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance._initialized = False
+                cls._instances[model_name] = instance
+            return instance
+    
+    def __init__(self, model_name: str = "latest"):
         """
         Initialize the Allosaurus service.
+        
+        Args:
+            model_name: Name of the Allosaurus model to load
+        """
+        if self._initialized:
+            return
+        
+        self._model = None
+        self._load_error: Optional[Exception] = None
+        self._ready = threading.Event()
+        
+        # Reprocessing and the sample endpoint submit the same audio repeatedly
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._initialized = True
+        
+        threading.Thread(target=self._load_model, args=(model_name,), daemon=True).start()
+    
+    @property
+    def model(self):
         """
-        # Import here to avoid dependency issues if allosaurus is not installed
-        from allosaurus.app import read_recognizer
-        self.model = read_recognizer()
+        The Allosaurus recognizer, waiting for the background load if necessary.
+        """
+        self._ready.wait()
+        if self._load_error is not None:
+            raise RuntimeError(f"Allosaurus model failed to load: {str(self._load_error)}")
+        return self._model
+    
+    def _load_model(self, model_name: str):
+        try:
+            # Import here to avoid dependency issues if allosaurus is not installed
+            from allosaurus.app import read_recognizer
+            self._model = read_recognizer(model_name)
+        except Exception as e:
+            logger.error(f"Error loading Allosaurus model: {str(e)}")
+            self._load_error = e
+        finally:
+            self._ready.set()
+        
+        if self._load_error is None:
+            self.warm_up()
+    
+    def warm_up(self):
+        """
+        Run the model once on a short silent clip.
+        
+        The first inference pays for lazy initialisation inside the model; doing it right after
+        loading keeps that cost out of the first user request.
+        """
+        fd, warm_up_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with wave.open(warm_up_path, "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(16000)
+                wav_file.writeframes(b"\x00\x00" * 8000)  # 0.5 seconds of silence
+            self.model.recognize(warm_up_path)
+        except Exception as e:
+            logger.warning(f"Allosaurus warm-up failed: {str(e)}")
+        finally:
+            os.remove(warm_up_path)
     
     async def recognize_phonemes(self, file_path: str) -> Dict[str, Any]:
         """
@@ -41,14 +128,39 @@ class AllosaurusService:
         Returns:
             Dictionary containing the recognized phonemes
         """
+        cache_key = self._audio_key(file_path)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+        
         # Run inference
         phoneme_string = self.model.recognize(file_path)
         
         # Process the phoneme string
         phonemes = [p for p in phoneme_string.split() if p.strip()]
         
-        return {
+        result = {
             "text": phoneme_string,
             "phonemes": phonemes,
             "confidence": 1.0  # Allosaurus doesn't provide confidence scores by default
-        } 
\ No newline at end of file
+        }
+        
+        with self._cache_lock:
+            self._cache[cache_key] = result
+            if len(self._cache) > RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        
+        return result
+    
+    @staticmethod
+    def _audio_key(file_path: str) -> str:
+        """
+        Hash the audio file contents, so copies of the same recording share a cache entry.
+        """
+        digest = hashlib.blake2b(digest_size=32)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest() 
\ No newline at end of file
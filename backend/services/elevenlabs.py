@@ -2,12 +2,15 @@
 ElevenLabs Speech-to-Text API service.
 """
 import os
+import logging
 import aiohttp
 import asyncio
 from typing import Optional
 from models.elevenlabs import ElevenLabsOutput
 import json
 
+logger = logging.getLogger(__name__)
+
 class ElevenLabsService:
     """
     Service for interacting with the ElevenLabs Speech-to-Text API.
@@ -27,6 +30,25 @@ class ElevenLabsService:
         
         self.base_url = "https://api.elevenlabs.io/v1"
         self.speech_to_text_url = f"{self.base_url}/speech-to-text"
+        
+        # Created on first use, since an aiohttp session must belong to a running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the HTTP session shared by all calls, so connections and TLS sessions are reused.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+    
+    async def close(self):
+        """
+        Close the shared HTTP session.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def speech_to_text(self, file_path: str) -> ElevenLabsOutput:
         """
@@ -38,32 +60,29 @@ class ElevenLabsService:
         Returns:
             Dictionary containing the transcription results
         """
-        # Read file binary data
-        with open(file_path, "rb") as f:
-            file_data = f.read()
-        
         # Prepare headers and data for the request
         headers = {
             "xi-api-key": self.api_key,
             "accept": "application/json"
         }
         
-        data = aiohttp.FormData()
-        data.add_field(
-            "file",  # Use 'file' instead of 'audio' as the field name
-            file_data, 
-            filename=os.path.basename(file_path),
-            content_type="audio/wav"
-        )
-        
-        # Add parameters for speech-to-text
-        data.add_field("model_id", "scribe_v1")  # Use scribe_v1 instead of eleven_turbo_v2
-        data.add_field("diarize", "true")  # Enable speaker diarization
-        data.add_field("language", "de")  # German language
-        
-        # Make the API call
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
+        # Stream the file into the request body; aiohttp reads file objects in a thread pool
+        with open(file_path, "rb") as audio_file:
+            data = aiohttp.FormData()
+            data.add_field(
+                "file",  # Use 'file' instead of 'audio' as the field name
+                audio_file, 
+                filename=os.path.basename(file_path),
+                content_type="audio/wav"
+            )
+            
+            # Add parameters for speech-to-text
+            data.add_field("model_id", "scribe_v1")  # Use scribe_v1 instead of eleven_turbo_v2
+            data.add_field("diarize", "true")  # Enable speaker diarization
+            data.add_field("language", "de")  # German language
+            
+            # Make the API call
+            async with self._get_session().post(
                 self.speech_to_text_url, 
                 headers=headers,
                 data=data
@@ -73,18 +92,9 @@ class ElevenLabsService:
                     raise Exception(f"ElevenLabs API error: {response.status}, {error_text}")
                 
                 response_json = await response.json()
-                
-                # Log the full response
-                print("FULL ELEVENLABS RESPONSE:")
-                print(json.dumps(response_json, indent=2))
-                
-                # Specifically check for speaker information
-                words = response_json.get("words", [])
-                speaker_ids = set()
-                for word in words[:20]:  # Check first 20 words
-                    if "speaker" in word:
-                        speaker_ids.add(word["speaker"])
-                
-                print(f"Found {len(speaker_ids)} unique speaker IDs in first 20 words: {speaker_ids}")
-                
-                return ElevenLabsOutput.from_response(response_json)
\ No newline at end of file
+        
+        # The full response holds every word, only serialise it when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Full ElevenLabs response: {json.dumps(response_json, indent=2)}")
+        
+        return ElevenLabsOutput.from_response(response_json)
@@ -0,0 +1,37 @@
+"""
+Shared HTTP client for outbound API calls.
+"""
+from typing import Optional
+
+import httpx
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide HTTP client, creating it on first use.
+
+    The client keeps connections alive and negotiates HTTP/2, so repeated and concurrent
+    requests to the same API reuse one TLS connection instead of paying a new handshake.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # Pool limits and HTTP/2 live on the transport, which is needed for connection retries
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+        _http_client = httpx.AsyncClient(transport=transport, timeout=120, follow_redirects=True)
+    return _http_client
+
+
+async def close_http_client():
+    """
+    Close the shared HTTP client if it was created.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
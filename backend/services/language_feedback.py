@@ -2,13 +2,16 @@
 Mistral API service implementation with OpenAI fallback.
 """
 import asyncio
-import json
+import hashlib
+import orjson
 import logging
+import httpx
 
-from typing import Dict, Any, Tuple, Optional, List
-from openai import AsyncOpenAI
-from mistralai.client import MistralClient
+from collections import OrderedDict
+from typing import Dict, Any, Tuple, Optional, List, Callable, Iterator, get_args, get_origin
+from pydantic import BaseModel
 from models.elevenlabs import ElevenLabsOutput
+from services.http_client import get_http_client
 from models.language_feedback import (
     EvaluationResponse,
     EvaluationResponseRanged,
@@ -20,6 +23,9 @@ from models.language_feedback import (
     PhoneticItemRanged
 )
 
+# Bump whenever the prompts change so cached feedback from older prompts is not reused
+PROMPT_VERSION = "1"
+
 PROMPT_PREFIX = """
 Du bist ein sprachlicher Evaluierungsassistent, der dafür zuständig ist, transkribierte Audioaufnahmen (auf Deutsch) auf sprachliche Fehler und stilistische Verbesserungsmöglichkeiten zu untersuchen. Deine Aufgabe besteht darin, typische Fehler von Deutschlernenden zu erkennen und konstruktives Feedback zu geben.
 
@@ -183,35 +189,216 @@ Für jede phonetische Beobachtung, erstelle ein JSON-Objekt im folgenden Format:
 }
 """
 
+# Prompts are fixed, so they are assembled once at import rather than per request
+PHONETICS_PROMPT = PROMPT_PREFIX + PHONETICS_PROMPT_EXTENSION
+
+SUMMARY_PROMPT = "Du bist ein Sprachcoach, der eine Konversation zwischen zwei Personen zusammenfasst. Fasse die Konversation in maximal zwei Sätzen zusammen und gib nur den Text zurück."
+
 logger = logging.getLogger(__name__)
 
+FEEDBACK_SECTIONS = ("mistakes", "inaccuracies", "vocabularies", "phonetics")
+
+# Number of evaluated transcripts kept in the exact-match response cache
+FEEDBACK_CACHE_SIZE = 1024
+
+
+class _StreamingItemParser:
+    """
+    Incrementally extracts completed items from the top-level arrays of a streamed JSON object.
+
+    Only tracks nesting and string state, so each chunk is scanned once; the raw text of an
+    item is emitted as soon as its closing brace arrives.
+    """
+
+    def __init__(self, sections=FEEDBACK_SECTIONS):
+        self.sections = set(sections)
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._section = None
+        self._item_start = None
+
+    def feed(self, chunk: str) -> Iterator[Tuple[str, str]]:
+        """
+        Append a chunk of text and yield (section, item_json) for every item completed by it.
+        """
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start + 1:i]
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                if self._depth == 1 and ch == "[":
+                    self._section = self._last_key
+                elif self._depth == 2 and ch == "{" and self._section in self.sections:
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 2 and ch == "}" and self._item_start is not None:
+                    yield self._section, text[self._item_start:i + 1]
+                    self._item_start = None
+                elif self._depth == 1:
+                    self._section = None
+        self._pos = len(text)
+
+
+def _has_words(text: str) -> bool:
+    return any(ch.isalpha() for ch in text)
+
+
+def _list_item_model(annotation) -> Optional[type]:
+    if get_origin(annotation) is list:
+        (item_type,) = get_args(annotation)
+        if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+            return item_type
+    return None
+
+
+def _build_parser(model: type) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Generate a parser that builds `model` from a decoded JSON dict without Pydantic validation.
+
+    The parser is emitted as straight-line source from the model's field definitions (one function
+    per model, nested lists of models included), so it stays in sync with the models while doing
+    nothing but direct key access and model_construct calls. Required fields are read by key,
+    so a malformed item still fails with a KeyError.
+    """
+    namespace: Dict[str, Any] = {}
+    sources = []
+
+    def add(current: type) -> str:
+        func_name = f"_parse_{current.__name__}"
+        if current.__name__ in namespace:
+            return func_name
+        namespace[current.__name__] = current
+
+        args = []
+        for name, field in current.model_fields.items():
+            item_model = _list_item_model(field.annotation)
+            if field.is_required():
+                value = f"d[{name!r}]"
+            elif item_model is not None:
+                value = f"d.get({name!r}, ())"
+            else:
+                default_name = f"_default_{current.__name__}_{name}"
+                namespace[default_name] = field.default
+                value = f"d.get({name!r}, {default_name})"
+            if item_model is not None:
+                value = f"[{add(item_model)}(x) for x in {value}]"
+            args.append(f"{name}={value}")
+
+        sources.append(f"def {func_name}(d):\n    return {current.__name__}.model_construct({', '.join(args)})\n")
+        return func_name
+
+    root = add(model)
+    exec("\n".join(sources), namespace)
+    return namespace[root]
+
+
+# Fast path for trusted LLM output, built once at import
+_fast_parse = _build_parser(EvaluationResponse)
+
+
+def _create_mistral_client(api_key: Optional[str], http_client: httpx.AsyncClient):
+    """
+    Create a Mistral client that sends its requests through the given HTTP client.
+
+    The SDK has no option to inject a client and builds its own in __init__, so the subclass
+    repeats that setup without creating one. API-level retries keep the SDK default of 5;
+    connection retries come from the shared client's transport.
+    """
+    from mistralai.async_client import MistralAsyncClient
+    from mistralai.client_base import ClientBase
+    from mistralai.constants import ENDPOINT
+    from mistralai.files import FilesAsyncClient
+    from mistralai.jobs import JobsAsyncClient
+
+    class SharedClientMistral(MistralAsyncClient):
+        def __init__(self):
+            ClientBase.__init__(self, ENDPOINT, api_key)
+            self._client = http_client
+            self.files = FilesAsyncClient(self)
+            self.jobs = JobsAsyncClient(self)
+
+        async def close(self) -> None:
+            # The shared client is owned by services.http_client and closed on shutdown
+            pass
+
+    return SharedClientMistral()
+
+
 class LanguageFeedbackService:
-    def __init__(self, use_mistral: bool = True, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        use_mistral: bool = True,
+        api_key: Optional[str] = None,
+        strict_validation: bool = False,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         """Initialize the service with either Mistral or OpenAI client.
         
         Args:
             use_mistral: If True, use Mistral AI API, otherwise use OpenAI
             api_key: Optional API key. If not provided, will look for MISTRAL_API_KEY or OPENAI_API_KEY in environment
+            strict_validation: If True, run full Pydantic validation on the LLM output (useful for debugging prompts)
+            http_client: Optional HTTP client for the API calls. Defaults to the shared process-wide client
         """
         self.use_mistral = use_mistral
+        self.strict_validation = strict_validation
+        http_client = http_client or get_http_client()
+        # Import only the SDK in use; each pulls in a large package at import time
         if use_mistral:
-            self.client = MistralClient(api_key=api_key)
+            self.client = _create_mistral_client(api_key, http_client)
         else:
-            self.client = AsyncOpenAI(api_key=api_key)
+            from openai import AsyncOpenAI
+            self.client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+        # Unranged responses keyed by prompt and transcript; ranges depend on the segments of each request
+        self._cache: "OrderedDict[str, EvaluationResponse]" = OrderedDict()
     
     async def process_transcript(
         self, 
         transcript: ElevenLabsOutput, 
-        elevenlabs_segments: List[str], 
         include_phonetics: bool = False,
-        phonetics_data = None
+        phonetics_data = None,
+        on_item: Optional[Callable[[str, Any], None]] = None
     ) -> EvaluationResponseRanged:
+        """
+        Evaluate the transcript and map every feedback item onto the ElevenLabs segments.
+        
+        Args:
+            transcript: The ElevenLabs transcription to evaluate, its segments are used to locate the quoted text
+            include_phonetics: If True, also ask for pronunciation feedback
+            phonetics_data: Optional Allosaurus output to include in the prompt
+            on_item: Optional callback receiving (section, ranged_item) for every item as soon as
+                it has been streamed from Mistral, before the full response is complete
+        """
         transcript_text = transcript.extract_text()
+        elevenlabs_segments = transcript.segments
+        
+        # Nothing to evaluate for silent or non-verbal recordings
+        if not _has_words(transcript_text):
+            return EvaluationResponseRanged(mistakes=[], inaccuracies=[], vocabularies=[], phonetics=[])
         
         # Create the prompt with optional phonetics section
         prompt = PROMPT_PREFIX
         if include_phonetics:
-            prompt += PHONETICS_PROMPT_EXTENSION
+            prompt = PHONETICS_PROMPT
             
             # Add phonetics data from Allosaurus if available
             if phonetics_data:
@@ -224,6 +411,13 @@ class LanguageFeedbackService:
                 if phonetics_info:
                     prompt += phonetics_info
         
+        cache_key = self.__cache_key(prompt, transcript_text)
+        eval_response = self._cache.get(cache_key)
+        if eval_response is not None:
+            logger.info("Using cached feedback for identical transcript")
+            self._cache.move_to_end(cache_key)
+            return LanguageFeedbackService.__convert_to_ranges(eval_response, elevenlabs_segments)
+        
         if self.use_mistral:
             # Mistral AI implementation
             messages = [
@@ -232,14 +426,8 @@ class LanguageFeedbackService:
             ]
             
             try:
-                completion = self.client.chat(
-                    model="mistral-large-latest",
-                    messages=messages,
-                    response_format={"type": "json_object"} 
-                )
-                
-                result = completion.choices[0].message.content
-                result_json = json.loads(result)
+                result = await self._stream_mistral(messages, elevenlabs_segments, on_item)
+                result_json = orjson.loads(result)
                 
                 # Ensure all required fields are present
                 if 'mistakes' not in result_json:
@@ -251,17 +439,14 @@ class LanguageFeedbackService:
                 if 'phonetics' not in result_json:
                     result_json['phonetics'] = []
                     
-                # Create a valid EvaluationResponse
-                eval_response = EvaluationResponse(**result_json)
+                eval_response = self.__parse_response(result_json)
+                # The ranged models validate every item, so malformed output fails here and is not cached
+                ranged_response = LanguageFeedbackService.__convert_to_ranges(eval_response, elevenlabs_segments)
+                self.__cache_store(cache_key, eval_response)
+                return ranged_response
             except Exception as e:
-                # If parsing fails, create a default response with the transcript
+                # If parsing fails, fall back to an empty response
                 logger.error(f"Error processing transcript with Mistral: {str(e)}")
-                eval_response = EvaluationResponse(
-                    mistakes=[],
-                    inaccuracies=[],
-                    vocabularies=[],
-                    phonetics=[]
-                )
         else:
             # OpenAI implementation
             try:
@@ -276,28 +461,71 @@ class LanguageFeedbackService:
                 
                 result = completion.choices[0].message.content
                 assert result is not None
-                eval_response = EvaluationResponse(**json.loads(result))
+                eval_response = self.__parse_response(orjson.loads(result))
+                ranged_response = LanguageFeedbackService.__convert_to_ranges(eval_response, elevenlabs_segments)
+                self.__cache_store(cache_key, eval_response)
+                return ranged_response
             except Exception as e:
-                # If parsing fails, create a default response
+                # If parsing fails, fall back to an empty response
                 logger.error(f"Error processing transcript with OpenAI: {str(e)}")
-                eval_response = EvaluationResponse(
-                    mistakes=[],
-                    inaccuracies=[],
-                    vocabularies=[],
-                    phonetics=[]
-                )
 
-        return LanguageFeedbackService.__convert_to_ranges(eval_response, elevenlabs_segments)
+        return EvaluationResponseRanged(mistakes=[], inaccuracies=[], vocabularies=[], phonetics=[])
     
 
+    def __parse_response(self, result_json: Dict[str, Any]) -> EvaluationResponse:
+        if self.strict_validation:
+            return EvaluationResponse(**result_json)
+        return _fast_parse(result_json)
+
+    def __cache_key(self, prompt: str, transcript_text: str) -> str:
+        key = hashlib.blake2b(digest_size=32)
+        for part in (PROMPT_VERSION, "mistral" if self.use_mistral else "openai", prompt, transcript_text):
+            key.update(part.encode("utf-8"))
+            key.update(b"\0")
+        return key.hexdigest()
+
+    def __cache_store(self, cache_key: str, eval_response: EvaluationResponse):
+        self._cache[cache_key] = eval_response
+        self._cache.move_to_end(cache_key)
+        if len(self._cache) > FEEDBACK_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def _stream_mistral(
+        self,
+        messages: List[Dict[str, str]],
+        elevenlabs_segments: List[str],
+        on_item: Optional[Callable[[str, Any], None]] = None
+    ) -> str:
+        """
+        Run a single feedback completion and return the raw JSON text.
+        
+        The completion is streamed so finished items can be reported while Mistral is still generating.
+        """
+        parser = _StreamingItemParser()
+        async for chunk in self.client.chat_stream(
+            model="mistral-large-latest",
+            messages=messages,
+            response_format={"type": "json_object"} 
+        ):
+            content = chunk.choices[0].delta.content
+            if not content:
+                continue
+            for section, item_json in parser.feed(content):
+                if on_item is not None:
+                    LanguageFeedbackService.__emit_item(on_item, section, item_json, elevenlabs_segments)
+        return parser.text
+
     async def summarize_conversation(self, transcript: ElevenLabsOutput) -> str:
         transcript_text = transcript.extract_text()
+        if not _has_words(transcript_text):
+            return ""
+        
         messages = [
-            {"role": "system", "content": "Du bist ein Sprachcoach, der eine Konversation zwischen zwei Personen zusammenfasst. Fasse die Konversation in maximal zwei Sätzen zusammen und gib nur den Text zurück."},
+            {"role": "system", "content": SUMMARY_PROMPT},
             {"role": "user", "content": transcript_text}
         ]
         
-        completion = self.client.chat(
+        completion = await self.client.chat(
             model="mistral-large-latest",  
             messages=messages,
             response_format={"type": "text"}
@@ -305,6 +533,25 @@ class LanguageFeedbackService:
         result = completion.choices[0].message.content
         return result
 
+    @staticmethod
+    def __emit_item(on_item: Callable[[str, Any], None], section: str, item_json: str, elevenlabs_segments: List[str]) -> None:
+        try:
+            item = orjson.loads(item_json)
+            user_segments = LanguageFeedbackService.__user_segments(elevenlabs_segments)
+            if section == "vocabularies":
+                ranged = LanguageFeedbackService.__convert_vocab_item_to_ranged(
+                    VocabItem.model_construct(**item), user_segments, {})
+            elif section == "phonetics":
+                ranged = LanguageFeedbackService.__convert_phonetic_item_to_ranged(
+                    PhoneticItem.model_construct(**item), user_segments, {})
+            else:
+                ranged = LanguageFeedbackService.__convert_error_item_to_ranged(
+                    ErrorItem.model_construct(**item), user_segments, {})
+            on_item(section, ranged)
+        except Exception as e:
+            # Streamed items are best effort, the complete response is still parsed afterwards
+            logger.warning(f"Could not process streamed {section} item: {str(e)}")
+
     
     @staticmethod
     def __find_substring_range(full_string: str, substring: str, start_from: int = 0) -> Optional[Tuple[int, int]]:
@@ -314,24 +561,49 @@ class LanguageFeedbackService:
             return start, end
         except:
             return None
-    
+
+    @staticmethod
+    def __user_segments(elevenlabs_segments: List[str]) -> List[Tuple[int, str]]:
+        # Feedback only refers to the learner, whose turns are the even segments
+        return [(i, segment) for i, segment in enumerate(elevenlabs_segments) if i % 2 == 0]
+
     @staticmethod
-    def __convert_error_item_to_ranged(error_item: ErrorItem, elevenlabs_segments: List[str]) -> ErrorItemRanged:
+    def __find_quote_ranges(
+        quote: str,
+        user_segments: List[Tuple[int, str]],
+        range_cache: Dict[str, List[Tuple[int, int, int]]]
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Find all non-overlapping occurrences of the quote, reusing earlier searches for the same quote.
+        """
+        if quote in range_cache:
+            return range_cache[quote]
+
         ranges = []
+        if quote:
+            for i, segment in user_segments:
+                last_idx = 0
+                while True:
+                    idx = LanguageFeedbackService.__find_substring_range(
+                        segment, quote, last_idx
+                    )
+                    if idx is None:
+                        break
+                    ranges.append((i, idx[0], idx[1]))
+                    last_idx = idx[1]
 
-        for i, segment in enumerate(elevenlabs_segments):
-            if i % 2 == 1:
-                continue
-            
-            last_idx = 0
-            while True:
-                idx = LanguageFeedbackService.__find_substring_range(
-                    segment, error_item.quote, last_idx
-                )
-                if idx is None:
-                    break
-                ranges.append((i, idx[0], idx[1]))
-                last_idx = idx[1]
+        range_cache[quote] = ranges
+        return ranges
+    
+    @staticmethod
+    def __convert_error_item_to_ranged(
+        error_item: ErrorItem,
+        user_segments: List[Tuple[int, str]],
+        range_cache: Dict[str, List[Tuple[int, int, int]]]
+    ) -> ErrorItemRanged:
+        ranges = LanguageFeedbackService.__find_quote_ranges(
+            error_item.quote, user_segments, range_cache
+        )
         
         if not ranges:
             logger.warning(f"Could not find substring range for error item: {error_item}")
@@ -344,7 +616,7 @@ class LanguageFeedbackService:
             )
         
         return ErrorItemRanged(
-            ranges=ranges,
+            ranges=list(ranges),
             error_type=error_item.error_type,
             correction=error_item.correction,
             quote=error_item.quote,
@@ -352,20 +624,16 @@ class LanguageFeedbackService:
         )
     
     @staticmethod
-    def __convert_vocab_item_to_ranged(vocab_item: VocabItem, elevenlabs_segments: List[str]) -> VocabItemRanged:
-        range = None
-        for i, segment in enumerate(elevenlabs_segments):
-            if i % 2 == 1:
-                continue
-
-            range = LanguageFeedbackService.__find_substring_range(
-                segment, vocab_item.quote
-            )
-            if range:
-                range = (i, range[0], range[1])
-                break
+    def __convert_vocab_item_to_ranged(
+        vocab_item: VocabItem,
+        user_segments: List[Tuple[int, str]],
+        range_cache: Dict[str, List[Tuple[int, int, int]]]
+    ) -> VocabItemRanged:
+        ranges = LanguageFeedbackService.__find_quote_ranges(
+            vocab_item.quote, user_segments, range_cache
+        )
 
-        if range is None:
+        if not ranges:
             logger.warning(f"Could not find substring range for error item: {vocab_item}")
             return VocabItemRanged(
                 range=None,
@@ -375,27 +643,23 @@ class LanguageFeedbackService:
             )
         
         return VocabItemRanged(
-            range=range,
+            range=ranges[0],
             synonyms=vocab_item.synonyms,
             quote=vocab_item.quote,
             found_range=True
         )
 
     @staticmethod
-    def __convert_phonetic_item_to_ranged(phonetic_item: PhoneticItem, elevenlabs_segments: List[str]) -> PhoneticItemRanged:
-        range = None
-        for i, segment in enumerate(elevenlabs_segments):
-            if i % 2 == 1:
-                continue
-
-            range = LanguageFeedbackService.__find_substring_range(
-                segment, phonetic_item.quote
-            )
-            if range:
-                range = (i, range[0], range[1])
-                break
+    def __convert_phonetic_item_to_ranged(
+        phonetic_item: PhoneticItem,
+        user_segments: List[Tuple[int, str]],
+        range_cache: Dict[str, List[Tuple[int, int, int]]]
+    ) -> PhoneticItemRanged:
+        ranges = LanguageFeedbackService.__find_quote_ranges(
+            phonetic_item.quote, user_segments, range_cache
+        )
 
-        if range is None:
+        if not ranges:
             logger.warning(f"Could not find substring range for phonetic item: {phonetic_item}")
             return PhoneticItemRanged(
                 range=None,
@@ -406,7 +670,7 @@ class LanguageFeedbackService:
             )
         
         return PhoneticItemRanged(
-            range=range,
+            range=ranges[0],
             phonetic_issue=phonetic_item.phonetic_issue,
             suggested_pronunciation=phonetic_item.suggested_pronunciation,
             quote=phonetic_item.quote,
@@ -415,28 +679,32 @@ class LanguageFeedbackService:
 
     @staticmethod
     def __convert_to_ranges(response: EvaluationResponse, elevenlabs_segments: List[str]) -> EvaluationResponseRanged:
+        # Search the learner segments once per quote, repeated quotes (e.g. filler words) reuse the result
+        user_segments = LanguageFeedbackService.__user_segments(elevenlabs_segments)
+        range_cache: Dict[str, List[Tuple[int, int, int]]] = {}
+
         mistakes = []
         for error_item in response.mistakes:
             ranged_error = LanguageFeedbackService.__convert_error_item_to_ranged(
-                error_item, elevenlabs_segments)
+                error_item, user_segments, range_cache)
             mistakes.append(ranged_error)
         
         inaccuracies = []
         for error_item in response.inaccuracies:
             ranged_error = LanguageFeedbackService.__convert_error_item_to_ranged(
-                error_item, elevenlabs_segments)
+                error_item, user_segments, range_cache)
             inaccuracies.append(ranged_error)
 
         vocabularies = []
         for vocab_item in response.vocabularies:
             ranged_vocab = LanguageFeedbackService.__convert_vocab_item_to_ranged(
-                vocab_item, elevenlabs_segments)
+                vocab_item, user_segments, range_cache)
             vocabularies.append(ranged_vocab)
             
         phonetics = []
         for phonetic_item in response.phonetics:
             ranged_phonetic = LanguageFeedbackService.__convert_phonetic_item_to_ranged(
-                phonetic_item, elevenlabs_segments)
+                phonetic_item, user_segments, range_cache)
             phonetics.append(ranged_phonetic)
         
         return EvaluationResponseRanged(
@@ -6,6 +6,13 @@ import pytest
 import asyncio
 from services.allosaurus_service import AllosaurusService
 
+@pytest.fixture(scope="session")
+def allosaurus_service():
+    """
+    Provides the AllosaurusService instance shared by all tests.
+    """
+    return AllosaurusService()
+
 @pytest.fixture
 def sample_wav_path():
     """
@@ -20,16 +27,16 @@ def sample_wav_path():
     return sample_path
 
 @pytest.mark.asyncio
-async def test_allosaurus_service_initialization():
+async def test_allosaurus_service_initialization(allosaurus_service):
     """Test that the AllosaurusService initializes properly."""
-    service = AllosaurusService()
+    service = allosaurus_service
     assert service is not None
     assert hasattr(service, 'model')
 
 @pytest.mark.asyncio
-async def test_phoneme_recognition(sample_wav_path):
+async def test_phoneme_recognition(allosaurus_service, sample_wav_path):
     """Test phoneme recognition function."""
-    service = AllosaurusService()
+    service = allosaurus_service
     
     result = await service.recognize_phonemes(sample_wav_path)
     
@@ -43,4 +50,4 @@ async def test_phoneme_recognition(sample_wav_path):
     assert len(result["phonemes"]) > 0
 
 if __name__ == "__main__":
-    asyncio.run(test_allosaurus_service_initialization()) 
\ No newline at end of file
+    asyncio.run(test_allosaurus_service_initialization(AllosaurusService())) 
\ No newline at end of file
@@ -5,16 +5,17 @@ This script tests the ElevenLabs service by transcribing a sample.wav file
 and saves the output to sample_output.json.
 """
 import asyncio
-import json
 import os
 from dotenv import load_dotenv
 from services.elevenlabs import ElevenLabsService
+from utils import dumps_json
 
 # Load environment variables
 load_dotenv()
 
 async def test_elevenlabs():
     """Test the ElevenLabs speech-to-text service and save the output"""
+    service = None
     try:
         # Initialize the service
         service = ElevenLabsService()
@@ -42,8 +43,8 @@ async def test_elevenlabs():
         
         # Save the result to a JSON file
         output_path = os.path.join(os.path.dirname(__file__), "sample_output.json")
-        with open(output_path, "w") as f:
-            json.dump(result_dict, f, indent=2)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(dumps_json(result_dict, pretty=True))
         
         print(f"Transcription complete. Output saved to {output_path}")
         print("\nTranscription result:")
@@ -51,6 +52,9 @@ async def test_elevenlabs():
         
     except Exception as e:
         print(f"Error testing ElevenLabs service: {str(e)}")
+    finally:
+        if service is not None:
+            await service.close()
 
 if __name__ == "__main__":
     # Run the async test function
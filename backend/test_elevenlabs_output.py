@@ -0,0 +1,40 @@
+"""
+Test parsing of ElevenLabs API responses into ElevenLabsOutput.
+"""
+import os
+import json
+from models.elevenlabs import ElevenLabsOutput
+
+def test_from_response_sample_file():
+    """Test that the stored sample response parses."""
+    sample_path = os.path.join(os.path.dirname(__file__), "sample_json_output_elevenlabs.json")
+    with open(sample_path, encoding="utf-8") as f:
+        response_data = json.load(f)
+
+    result = ElevenLabsOutput.from_response(response_data)
+
+    assert result.text == response_data["text"]
+    assert result.language_code == response_data["language"]
+    assert result.segments == [response_data["text"]]
+
+def test_from_response_words():
+    """Test that words and speakers are read from the response."""
+    response_data = {
+        "text": "Hello there. Hi!",
+        "language": "en",
+        "words": [
+            {"text": "Hello", "start": 0.0, "end": 0.4, "type": "word", "speaker": "speaker_1"},
+            {"text": " ", "start": 0.4, "end": 0.5, "type": "spacing", "speaker": "speaker_1"},
+            {"text": "there.", "start": 0.5, "end": 0.9, "type": "word", "speaker": "speaker_1"},
+            {"text": "Hi!", "start": 1.2, "end": 1.5, "type": "word", "speaker_id": "speaker_2"},
+        ]
+    }
+
+    result = ElevenLabsOutput.from_response(response_data)
+
+    assert [word.text for word in result.words] == ["Hello", " ", "there.", "Hi!"]
+    assert [word.speaker_id for word in result.words] == ["speaker_1", "speaker_1", "speaker_1", "speaker_2"]
+    assert result.speaker_segments == [
+        {"speaker_id": "speaker_1", "content": "Hello there."},
+        {"speaker_id": "speaker_2", "content": "Hi!"},
+    ]
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 import os
 import sys
@@ -9,7 +8,7 @@ from dotenv import load_dotenv
 import requests  # Add for direct API testing
 
 from services.elevenlabs import ElevenLabsService
-from utils import get_root_folder
+from utils import dumps_json, get_root_folder
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +21,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("elevenlabs_test")
 
+# Number of frames copied at a time when slicing WAV files
+WAV_CHUNK_FRAMES = 8192
+
 # Load environment variables
 load_dotenv(dotenv_path=get_root_folder() / ".env")
 
@@ -48,6 +50,100 @@ def check_wav_file(file_path):
         logger.error(f"Error checking WAV file: {str(e)}")
         return False
 
+def direct_api_call(test_file, api_key):
+    """Make a direct API call to ElevenLabs and log the response."""
+    logger.info("Making direct API call to ElevenLabs...")
+    try:
+        data = {
+            "model_id": "eleven_turbo_v2",
+            "language": "de"
+        }
+        headers = {
+            "xi-api-key": api_key,
+            # No Content-Type header - let requests set it for multipart/form-data
+        }
+        
+        # Log request details
+        logger.info(f"API URL: https://api.elevenlabs.io/v1/speech-to-text")
+        logger.info(f"Headers: {headers}")
+        logger.info(f"Data: {data}")
+        logger.info(f"File name: {os.path.basename(test_file)}")
+        logger.info(f"File size: {os.path.getsize(test_file)} bytes")
+        
+        # Pass the open file so the upload is read from disk as it is sent
+        with open(test_file, "rb") as f:
+            # Use proper multipart/form-data format
+            files = {
+                "audio": (os.path.basename(test_file), f, "audio/wav")
+            }
+            response = requests.post(
+                "https://api.elevenlabs.io/v1/speech-to-text",
+                headers=headers,
+                files=files,
+                data=data
+            )
+        
+        logger.info(f"Direct API response status: {response.status_code}")
+        logger.info(f"Direct API response headers: {response.headers}")
+        logger.info(f"Direct API response content: {response.text}")
+        
+        if response.status_code == 200:
+            logger.info("Direct API call successful!")
+            
+    except Exception as e:
+        logger.error(f"Error in direct API call: {str(e)}")
+
+def write_wav_slice(source_file, target_file, seconds):
+    """Write the first `seconds` of a WAV file to a new file."""
+    with wave.open(source_file, 'rb') as infile:
+        n_frames = infile.getframerate() * seconds
+        params = infile.getparams()
+        with wave.open(target_file, 'wb') as outfile:
+            outfile.setparams(params)
+            # Copy in fixed-size chunks so memory use doesn't grow with the slice length
+            remaining = n_frames
+            while remaining > 0:
+                frames = infile.readframes(min(WAV_CHUNK_FRAMES, remaining))
+                if not frames:
+                    break
+                outfile.writeframes(frames)
+                remaining -= WAV_CHUNK_FRAMES
+
+async def transcribe_smaller_sample(elevenlabs_service, test_file):
+    """Transcribe the first 10 seconds of the file to rule out file size issues."""
+    logger.info("Testing with a smaller sample (first 10 seconds)...")
+    try:
+        # Create a temporary file with just the first 10 seconds
+        temp_file = "temp_sample.wav"
+        await asyncio.to_thread(write_wav_slice, test_file, temp_file, 10)
+        
+        # Check the temporary file
+        await asyncio.to_thread(check_wav_file, temp_file)
+        
+        # Test the service with the smaller file
+        logger.info("Sending smaller file to ElevenLabs API via service...")
+        result = await elevenlabs_service.speech_to_text(temp_file)
+        
+        # Log the raw API response
+        logger.info("ElevenLabs API Response via service (smaller file):")
+        logger.info(dumps_json(result.model_dump(), pretty=True))
+        
+        # Extract and log the transcription text
+        transcription = result.extract_text()
+        logger.info(f"Transcription text (smaller file): {transcription}")
+        
+        if transcription:
+            logger.info("Test completed successfully with smaller file")
+            return result
+        
+        # Otherwise, continue with the original file
+        os.remove(temp_file)
+        
+    except Exception as e:
+        logger.error(f"Error testing with smaller file: {str(e)}")
+    
+    return None
+
 async def test_elevenlabs_transcription():
     # Find all WAV files in current directory
     wav_files = [f for f in os.listdir() if f.endswith(".wav")]
@@ -70,10 +166,11 @@ async def test_elevenlabs_transcription():
     logger.info(f"Testing ElevenLabs transcription with file: {test_file}")
     
     # Check WAV file properties
-    if not check_wav_file(test_file):
+    if not await asyncio.to_thread(check_wav_file, test_file):
         logger.error("Invalid WAV file. Please check the file format.")
         return
     
+    elevenlabs_service = None
     try:
         # Initialize the ElevenLabs service
         api_key = os.getenv("ELEVEN_LABS_API_KEY")
@@ -81,86 +178,15 @@ async def test_elevenlabs_transcription():
         
         elevenlabs_service = ElevenLabsService()
         
-        # Make a direct API call with correct format
-        logger.info("Making direct API call to ElevenLabs...")
-        try:
-            with open(test_file, "rb") as f:
-                file_data = f.read()
-            
-            # Use proper multipart/form-data format
-            files = {
-                "audio": (os.path.basename(test_file), file_data, "audio/wav")
-            }
-            data = {
-                "model_id": "eleven_turbo_v2",
-                "language": "de"
-            }
-            headers = {
-                "xi-api-key": api_key,
-                # No Content-Type header - let requests set it for multipart/form-data
-            }
-            
-            # Log request details
-            logger.info(f"API URL: https://api.elevenlabs.io/v1/speech-to-text")
-            logger.info(f"Headers: {headers}")
-            logger.info(f"Data: {data}")
-            logger.info(f"File name: {os.path.basename(test_file)}")
-            logger.info(f"File size: {len(file_data)} bytes")
-            
-            response = requests.post(
-                "https://api.elevenlabs.io/v1/speech-to-text",
-                headers=headers,
-                files=files,
-                data=data
-            )
-            
-            logger.info(f"Direct API response status: {response.status_code}")
-            logger.info(f"Direct API response headers: {response.headers}")
-            logger.info(f"Direct API response content: {response.text}")
-            
-            if response.status_code == 200:
-                logger.info("Direct API call successful!")
-                
-        except Exception as e:
-            logger.error(f"Error in direct API call: {str(e)}")
-        
-        # Try with a smaller sample to rule out file size issues
-        logger.info("Testing with a smaller sample (first 10 seconds)...")
-        try:
-            # Create a temporary file with just the first 10 seconds
-            temp_file = "temp_sample.wav"
-            with wave.open(test_file, 'rb') as infile:
-                n_frames = infile.getframerate() * 10  # 10 seconds of audio
-                params = infile.getparams()
-                with wave.open(temp_file, 'wb') as outfile:
-                    outfile.setparams(params)
-                    outfile.writeframes(infile.readframes(n_frames))
-            
-            # Check the temporary file
-            check_wav_file(temp_file)
-            
-            # Test the service with the smaller file
-            logger.info("Sending smaller file to ElevenLabs API via service...")
-            result = await elevenlabs_service.speech_to_text(temp_file)
-            
-            # Log the raw API response
-            logger.info("ElevenLabs API Response via service (smaller file):")
-            logger.info(json.dumps(result.model_dump(), indent=2))
-            
-            # Extract and log the transcription text
-            transcription = result.extract_text()
-            logger.info(f"Transcription text (smaller file): {transcription}")
-            
-            # If that worked, return this result
-            if transcription:
-                logger.info("Test completed successfully with smaller file")
-                return result
-            
-            # Otherwise, continue with the original file
-            os.remove(temp_file)
-            
-        except Exception as e:
-            logger.error(f"Error testing with smaller file: {str(e)}")
+        # The direct API call and the smaller-sample test are independent, so run them concurrently
+        _, result = await asyncio.gather(
+            asyncio.to_thread(direct_api_call, test_file, api_key),
+            transcribe_smaller_sample(elevenlabs_service, test_file)
+        )
+        
+        # If the smaller sample worked, return this result
+        if result is not None:
+            return result
         
         # Test the speech-to-text API through our service with original file
         logger.info("Sending original file to ElevenLabs API via service...")
@@ -168,7 +194,7 @@ async def test_elevenlabs_transcription():
         
         # Log the raw API response
         logger.info("ElevenLabs API Response via service:")
-        logger.info(json.dumps(result.model_dump(), indent=2))
+        logger.info(dumps_json(result.model_dump(), pretty=True))
         
         # Extract and log the transcription text
         transcription = result.extract_text()
@@ -186,6 +212,9 @@ async def test_elevenlabs_transcription():
     except Exception as e:
         logger.error(f"Error testing ElevenLabs transcription: {str(e)}", exc_info=True)
         return None
+    finally:
+        if elevenlabs_service is not None:
+            await elevenlabs_service.close()
 
 if __name__ == "__main__":
     # Run the test
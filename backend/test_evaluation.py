@@ -1,20 +1,37 @@
-import requests
-import time 
-import json 
-
-with open("/Users/m.mohammed/Downloads/hackathons/tech-berlin-munich/Tech-Munich25/backend/temp_e332ee30-b75c-4a7a-a7e9-1c434bd2b743.wav", "rb") as file:
-    r = requests.post("http://localhost:8000/upload", files={"file": file})
-
-response_json = r.json()
-status_code = response_json["status"]
-status_response = None
-task_id = response_json["id"]
-
-while not status_code == "completed":
-    print("waiting for task to complete")
-    status_response = requests.get(f"http://localhost:8000/status/{task_id}")
-    print(status_response.json())
-    status_code = status_response.json()["status"]
-    time.sleep(1)
-
-print(status_response.json())
\ No newline at end of file
+import asyncio
+import aiohttp
+
+BASE_URL = "http://localhost:8000"
+# Seconds the server may hold each status request open before we ask again
+STATUS_WAIT = 30
+
+
+async def main():
+    async with aiohttp.ClientSession() as session:
+        with open("/Users/m.mohammed/Downloads/hackathons/tech-berlin-munich/Tech-Munich25/backend/temp_e332ee30-b75c-4a7a-a7e9-1c434bd2b743.wav", "rb") as file:
+            form = aiohttp.FormData()
+            form.add_field("file", file)
+            async with session.post(f"{BASE_URL}/upload", data=form) as r:
+                response_json = await r.json()
+
+        # Uploaded files are only processed once processing is started explicitly
+        async with session.post(f"{BASE_URL}/start-processing/{response_json['id']}", data={"includePhonetics": "false"}) as r:
+            response_json = await r.json()
+
+        status_code = response_json["status"]
+        status_json = response_json
+        task_id = response_json["id"]
+
+        # Long-poll: the server answers as soon as the task finishes, so we only reissue on timeout
+        while status_code not in ("complete", "failed"):
+            print("waiting for task to complete")
+            async with session.get(f"{BASE_URL}/status/{task_id}", params={"wait": STATUS_WAIT}) as status_response:
+                status_json = await status_response.json()
+            print(status_json)
+            status_code = status_json["status"]
+
+        print(status_json)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+Test the helpers behind the language feedback service.
+"""
+import asyncio
+import orjson
+import pytest
+from models.elevenlabs import ElevenLabsOutput
+from models.language_feedback import EvaluationResponse
+from services.language_feedback import LanguageFeedbackService, _StreamingItemParser, _fast_parse
+
+def _service_returning(*responses):
+    """
+    Creates a service whose Mistral calls return the given raw responses in order.
+    """
+    service = LanguageFeedbackService(api_key="test")
+    calls = []
+
+    async def fake_stream(messages, elevenlabs_segments, on_item=None):
+        calls.append(messages)
+        return orjson.dumps(responses[len(calls) - 1]).decode()
+
+    service._stream_mistral = fake_stream
+    service.calls = calls
+    return service
+
+def _transcript(*segments):
+    """
+    Creates a transcript with one speaker turn per segment, alternating between two speakers.
+    """
+    words = [
+        {"text": word, "start": 0.0, "end": 0.0, "type": "word", "speaker": f"speaker_{i % 2}"}
+        for i, segment in enumerate(segments)
+        for word in segment.split(" ")
+    ]
+    return ElevenLabsOutput.from_response({"text": " ".join(segments), "words": words})
+
+def _feed_all(parser, text, chunk_size):
+    items = []
+    for i in range(0, len(text), chunk_size):
+        items.extend(parser.feed(text[i:i + chunk_size]))
+    return items
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+def test_streaming_parser_split_chunks(chunk_size):
+    """Test that items are extracted whole however the stream is split."""
+    response = {
+        "mistakes": [
+            {"quote": "a {b} [c]", "error_type": "x", "correction": "y"},
+            {"quote": "esc \\ \" }", "error_type": "x", "correction": "y"}
+        ],
+        "summary": [{"quote": "ignored"}],
+        "vocabularies": [{"quote": "gut", "synonyms": ["prima", "toll"]}],
+        "inaccuracies": []
+    }
+    text = orjson.dumps(response).decode()
+    parser = _StreamingItemParser()
+
+    items = _feed_all(parser, text, chunk_size)
+
+    assert [(section, orjson.loads(item)) for section, item in items] == [
+        ("mistakes", response["mistakes"][0]),
+        ("mistakes", response["mistakes"][1]),
+        ("vocabularies", response["vocabularies"][0]),
+    ]
+    assert parser.text == text
+
+def test_streaming_parser_incomplete_item():
+    """Test that an item is only emitted once its closing brace arrives."""
+    parser = _StreamingItemParser()
+
+    assert list(parser.feed('{"mistakes": [{"quote": "}"')) == []
+    assert list(parser.feed(', "error_type": "x", "correction": "y"}')) == [
+        ("mistakes", '{"quote": "}", "error_type": "x", "correction": "y"}')
+    ]
+
+@pytest.mark.parametrize("data", [
+    {"mistakes": [], "inaccuracies": [], "vocabularies": []},
+    {
+        "mistakes": [{"quote": "Ich ist", "error_type": "grammar", "correction": "Ich bin"}],
+        "inaccuracies": [{"quote": "gehen", "error_type": "word order", "correction": "gehe"}],
+        "vocabularies": [{"quote": "gut", "synonyms": ["prima", "toll"]}],
+        "phonetics": [{"quote": "ich", "phonetic_issue": "ch", "suggested_pronunciation": "ɪç"}]
+    },
+])
+def test_fast_parse_matches_validation(data):
+    """Test that the generated parser builds the same response as full validation."""
+    parsed = _fast_parse(data)
+
+    assert parsed == EvaluationResponse(**data)
+    assert parsed.model_dump() == EvaluationResponse(**data).model_dump()
+
+def test_fast_parse_rejects_missing_keys():
+    """Test that the generated parser fails on a missing required field."""
+    with pytest.raises(KeyError):
+        _fast_parse({"mistakes": [{"quote": "Ich ist"}], "inaccuracies": [], "vocabularies": []})
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("item", [
+    {"quote": None, "error_type": "grammar", "correction": "Ich bin"},
+    {"quote": "Ich ist", "error_type": 3, "correction": "Ich bin"},
+    {"quote": "Ich ist", "correction": "Ich bin"},
+    "Ich ist",
+])
+async def test_malformed_response_falls_back_to_empty(item):
+    """Test that malformed LLM output degrades to an empty response instead of raising."""
+    service = _service_returning({"mistakes": [item], "inaccuracies": [], "vocabularies": []})
+    transcript = _transcript("Ich ist müde.")
+    result = await service.process_transcript(transcript)
+
+    assert result.model_dump() == {"mistakes": [], "inaccuracies": [], "vocabularies": [], "phonetics": []}
+
+@pytest.mark.asyncio
+async def test_malformed_vocabulary_falls_back_to_empty():
+    """Test that a wrongly typed vocabulary item degrades to an empty response."""
+    service = _service_returning({
+        "mistakes": [], "inaccuracies": [],
+        "vocabularies": [{"quote": "müde", "synonyms": "erschöpft"}]
+    })
+    transcript = _transcript("Ich bin müde.")
+    result = await service.process_transcript(transcript)
+
+    assert result.vocabularies == []
+
+@pytest.mark.asyncio
+async def test_quote_ranges():
+    """Test that quotes are located in the learner's segments only."""
+    service = _service_returning({
+        "mistakes": [
+            {"quote": "ich", "error_type": "x", "correction": "Ich"},
+            {"quote": "ich", "error_type": "y", "correction": "Ich"},
+            {"quote": "", "error_type": "x", "correction": "y"},
+            {"quote": "du", "error_type": "x", "correction": "y"},
+        ],
+        "inaccuracies": [],
+        "vocabularies": [{"quote": "ich", "synonyms": ["man"]}]
+    })
+    transcript = _transcript("ich weiß ich", "du und ich", "ja ich")
+    result = await asyncio.wait_for(service.process_transcript(transcript), 5)
+
+    repeated, repeated_again, empty, other_speaker = result.mistakes
+    assert repeated.ranges == [(0, 0, 3), (0, 9, 12), (2, 3, 6)]
+    assert repeated_again.ranges == repeated.ranges
+    assert not empty.found_range and empty.ranges is None
+    assert not other_speaker.found_range
+    assert result.vocabularies[0].range == (0, 0, 3)
+
+@pytest.mark.asyncio
+async def test_only_valid_responses_are_cached():
+    """Test that a malformed response is retried while a valid one is served from the cache."""
+    valid = {
+        "mistakes": [{"quote": "Ich ist", "error_type": "grammar", "correction": "Ich bin"}],
+        "inaccuracies": [], "vocabularies": []
+    }
+    service = _service_returning(
+        {"mistakes": [{"quote": None, "error_type": "grammar", "correction": "Ich bin"}],
+         "inaccuracies": [], "vocabularies": []},
+        valid
+    )
+    transcript = _transcript("Ich ist müde.")
+    first = await service.process_transcript(transcript)
+    second = await service.process_transcript(transcript)
+    third = await service.process_transcript(transcript)
+
+    assert first.mistakes == []
+    assert [item.quote for item in second.mistakes] == ["Ich ist"]
+    assert third == second
+    assert len(service.calls) == 2
@@ -1,4 +1,12 @@
 import pathlib
 
+import orjson
+
 def get_root_folder():
-    return pathlib.Path(__file__).parent.parent.absolute()
\ No newline at end of file
+    return pathlib.Path(__file__).parent.parent.absolute()
+
+def dumps_json(obj, pretty=False):
+    """
+    Serialize obj to a JSON string with orjson, indented by two spaces if pretty is set.
+    """
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
\ No newline at end of file